@@ -1,17 +1,25 @@
-import json
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+DATA_PATH = 'data.json'
+
+
+# Parsed once per process; the mtime argument invalidates the cache when the file is edited
+@st.cache_data
+def load_local(path, mtime):
+    df = pd.read_json(path)
+    districts = df["district_name"].tolist()
+    # contiguous int64 array rather than a list of boxed ints (values may arrive as strings)
+    approved_labour_budget = pd.to_numeric(df["Approved_Labour_Budget"]).to_numpy(dtype=np.int64)
+    # percent_of_utilization = df["percentage_payments_gererated_within_15_days"].astype(int).tolist()
+    return districts, approved_labour_budget
+
 
 try:
-    with open('data.json', 'r') as f:
-        data = json.load(f)
+    districts, approved_labour_budget = load_local(DATA_PATH, os.path.getmtime(DATA_PATH))
 except FileNotFoundError:
     st.error("Error: 'data.json' not found. Please create the file.")
     st.stop()
-
-districts=[]
-approved_labour_budget=[]
-# percent_of_utilization=[]
-
-for i in data:
-    districts.append(i["district_name"])
-    approved_labour_budget.append(i["Approved_Labour_Budget"])
-    # percent_of_utilization.append(int((i["percentage_payments_gererated_within_15_days"])))
\ No newline at end of file
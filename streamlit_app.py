@@ -1,10 +1,18 @@
 import os
+import math
+import time
+import hashlib
 import requests
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+from dataclasses import dataclass, fields
 from dotenv import load_dotenv
 
+# orjson decodes the large /mgnrega/all payload much faster than stdlib json; optional
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # load environment variables from .env into os.env
 load_dotenv()
 
@@ -34,7 +42,7 @@ else:
     API_BASE = "http://localhost:8000"
 
 API_URL = API_BASE.rstrip("/") + "/mgnrega/all"
-HEALTH_URL = API_BASE.rstrip("/") + "/mgnrega/health"
+KPIS_URL = API_BASE.rstrip("/") + "/mgnrega/kpis"
 
 # Compatibility helper: safe rerun (some Streamlit versions don't expose experimental_rerun)
 def _safe_rerun():
@@ -48,18 +56,6 @@ def _safe_rerun():
         st.warning("Please refresh the browser page to retry.")
         st.stop()
 
-# Quick health check to fail fast and show useful diagnostics
-try:
-    hresp = requests.get(HEALTH_URL, timeout=5)
-    hresp.raise_for_status()
-    _health_ok = True
-except Exception as _e:
-    _health_ok = False
-    st.error(f"Backend health check failed for {HEALTH_URL}: {_e}")
-    if st.button("Retry health check"):
-        _safe_rerun()
-    st.stop()
-
 # NOTE: we intentionally do NOT display the backend URL in the UI for security/cleanliness
 
 st.set_page_config(layout="wide", page_title="MGNREGA Dashboard")
@@ -72,28 +68,255 @@ st.title("MGNREGA District / State Dashboard")
 #   implement the computations below (they will operate on the returned raw rows).
 compute_kpis_in_frontend = False
 
+PAYLOAD_TTL_SECONDS = 1800
+
 # Cached fetch to avoid repeated network calls on every Streamlit interaction
+@st.cache_data(persist="disk", show_spinner=False)
+def fetch_payload(api_url: str, _previous=None):
+    """Fetch payload from backend and cache it on disk for 30 minutes.
+    Caching prevents new network requests on widget interactions (e.g. selector changes);
+    the disk cache lets server restarts and other workers on the host skip the fetch.
+    Streamlit ignores `ttl` for disk-persisted caches (and never evicts disk entries), so
+    the payload carries `_fetched_at` and load_payload() clears the single entry once stale.
+    The response's ETag / Last-Modified are persisted inside the payload; when refetching,
+    load_payload passes the stale payload as `_previous` (not hashed) so the request is
+    conditional and a 304 reuses its body.
+    """
+    headers = {}
+    if _previous is not None:
+        if _previous.get("_etag"):
+            headers["If-None-Match"] = _previous["_etag"]
+        if _previous.get("_last_modified"):
+            headers["If-Modified-Since"] = _previous["_last_modified"]
+    resp = requests.get(api_url, headers=headers, timeout=1000)
+    if resp.status_code == 304 and headers:
+        # unchanged on the backend: reuse the body we already decoded
+        _previous["_fetched_at"] = time.time()
+        return _previous
+    resp.raise_for_status()
+    payload = orjson.loads(resp.content) if orjson is not None else resp.json()
+    # content hash identifies this payload for the frame cache below
+    payload["_payload_id"] = hashlib.md5(resp.content).hexdigest()
+    payload["_fetched_at"] = time.time()
+    # validators for the next conditional refetch (absent when the backend sends none)
+    payload["_etag"] = resp.headers.get("ETag")
+    payload["_last_modified"] = resp.headers.get("Last-Modified")
+    return payload
+
+def load_payload(api_url: str, force: bool = False):
+    """Return the cached payload, conditionally refetching (and replacing the disk entry)
+    once it is stale or when `force` is set.
+    """
+    payload = fetch_payload(api_url)
+    age = time.time() - payload.get("_fetched_at", 0)
+    # a forced refresh right after a cold fetch would just download the same body twice
+    if age > PAYLOAD_TTL_SECONDS or (force and age > 5):
+        fetch_payload.clear()
+        payload = fetch_payload(api_url, _previous=payload)
+    return payload
+
+# Per-district section figures and the reduction used for each (sum over rows or mean)
+DISTRICT_KPI_AGGS = {
+    "persondays_of_central_liability_so_far": "sum",
+    "sc_persondays": "sum",
+    "st_persondays": "sum",
+    "women_persondays": "sum",
+    "total_num_of_active_workers": "sum",
+    "total_households_worked": "sum",
+    "number_of_completed_works": "sum",
+    "number_of_ongoing_works": "sum",
+    "percent_of_category_B_works": "mean",
+    "percentage_of_expenditure_on_agriculture_allied_works": "mean",
+    "percent_of_NRM_expenditure": "mean",
+    "wages": "sum",
+    "material_and_skilled_wages": "sum",
+    "percentage_payments_generated_within_15_days": "mean",
+    "number_of_gp_with_nil_exp": "sum",
+    "total_exp": "sum",
+}
+
+def _num(v):
+    """float(v), or 0.0 for None, non-numeric, NaN or ±inf values."""
+    try:
+        v = float(v)
+    except (TypeError, ValueError):
+        return 0.0
+    return v if math.isfinite(v) else 0.0
+
+def _safe_ratio(num, den, scale=1.0):
+    """num / den * scale, or None when the denominator is zero."""
+    return num / den * scale if den else None
+
+@dataclass(frozen=True)
+class DistrictKPI:
+    """Typed view of a district's aggregated figures (keys of DISTRICT_KPI_AGGS).
+    Built once per rerun from the backend / fallback dict; missing, non-numeric, NaN or ±inf values become 0.
+    """
+    persondays_of_central_liability_so_far: float = 0.0
+    sc_persondays: float = 0.0
+    st_persondays: float = 0.0
+    women_persondays: float = 0.0
+    total_num_of_active_workers: float = 0.0
+    total_households_worked: float = 0.0
+    number_of_completed_works: float = 0.0
+    number_of_ongoing_works: float = 0.0
+    percent_of_category_B_works: float = 0.0
+    percentage_of_expenditure_on_agriculture_allied_works: float = 0.0
+    percent_of_NRM_expenditure: float = 0.0
+    wages: float = 0.0
+    material_and_skilled_wages: float = 0.0
+    percentage_payments_generated_within_15_days: float = 0.0
+    number_of_gp_with_nil_exp: float = 0.0
+    total_exp: float = 0.0
+
+    @classmethod
+    def from_mapping(cls, m):
+        return cls(**{f.name: _num(m.get(f.name)) for f in fields(cls)})
+
+    @property
+    def total_works(self):
+        return self.number_of_completed_works + self.number_of_ongoing_works
+
+    @property
+    def female_participation_rate(self):
+        return _safe_ratio(self.women_persondays, self.persondays_of_central_liability_so_far, 100)
+
+    @property
+    def sc_st_participation_rate(self):
+        return _safe_ratio(self.sc_persondays + self.st_persondays, self.persondays_of_central_liability_so_far, 100)
+
+    @property
+    def work_completion_ratio(self):
+        return _safe_ratio(self.number_of_completed_works, self.total_works, 100)
+
+    @property
+    def avg_cost_per_work(self):
+        return _safe_ratio(self.total_exp, self.total_works)
+
+# Numeric columns of mgnrega_data and their dtype (the backend may send them as strings or nulls)
+NUMERIC_COLS = {
+    "approved_labour_budget": "int64",
+    "persondays_of_central_liability_so_far": "int64",
+    "sc_persondays": "int64",
+    "st_persondays": "int64",
+    "women_persondays": "int64",
+    "total_num_of_active_workers": "int64",
+    "total_households_worked": "int64",
+    "number_of_completed_works": "int64",
+    "number_of_ongoing_works": "int64",
+    "number_of_gp_with_nil_exp": "int64",
+    "total_exp": "float64",
+    "wages": "float64",
+    "material_and_skilled_wages": "float64",
+    "average_wage_rate_per_day_per_person": "float64",
+    "average_days_of_employment_per_household": "float64",
+    "percent_of_category_B_works": "float64",
+    "percentage_of_expenditure_on_agriculture_allied_works": "float64",
+    "percent_of_NRM_expenditure": "float64",
+    "percentage_payments_generated_within_15_days": "float64",
+}
+
+@st.cache_resource(max_entries=2)
+def build_frames(payload_id: str, _rows):
+    """Build the typed mgnrega DataFrame once per payload and share it across reruns/sessions.
+    `_rows` is not hashed by Streamlit; `payload_id` keys the cache. Treat the result as read-only.
+    Also returns a district_name -> row positions index so filtering is a dict lookup.
+    """
+    df = pd.DataFrame(_rows) if _rows else pd.DataFrame()
+    if not df.empty:
+        # coerce once here so readers never need per-value int()/float() guards
+        for col in NUMERIC_COLS:
+            if col not in df.columns:
+                df[col] = 0
+        num_cols = list(NUMERIC_COLS)
+        df[num_cols] = df[num_cols].apply(pd.to_numeric, errors="coerce").replace([np.inf, -np.inf], np.nan)
+        # count/budget columns: missing -> 0, rounded (not truncated) to int64.
+        # float columns keep NaN so sum()/mean() skip missing rows instead of counting them as 0.
+        int_cols = [c for c, dtype in NUMERIC_COLS.items() if dtype == "int64"]
+        df[int_cols] = df[int_cols].fillna(0).round()
+        df = df.astype(NUMERIC_COLS)
+    district_index = {}
+    if "district_name" in df.columns:
+        df["district_name"] = df["district_name"].astype("category")
+        district_index = df.groupby("district_name", observed=True).indices
+    return df, district_index
+
+@st.cache_resource(max_entries=2)
+def kpi_table(payload_id: str, _df):
+    """Aggregate DISTRICT_KPI_AGGS for every district once per payload (one row per district).
+    `_df` is not hashed by Streamlit; `payload_id` keys the cache. Shared like build_frames,
+    so reruns get the same object back without a pickle copy; treat it as read-only.
+    """
+    if _df.empty or "district_name" not in _df.columns:
+        return pd.DataFrame(columns=list(DISTRICT_KPI_AGGS))
+    return _df.groupby("district_name", observed=True).agg(DISTRICT_KPI_AGGS)
+
+@st.cache_resource(max_entries=2)
+def build_indexes(payload_id: str, _payload):
+    """Build the backend per-state KPI lookup once per payload.
+    `_payload` is not hashed by Streamlit; `payload_id` keys the cache. Shared (no per-rerun
+    copy) like build_frames; treat it as read-only.
+    """
+    return {s["state_name"]: s for s in ((_payload.get("kpis") or {}).get("by_state") or [])}
+
+@st.cache_resource(max_entries=2)
+def sidebar_options(payload_id: str, _states, _districts):
+    """Build the sidebar selectbox options once per payload as immutable tuples.
+    Returns ("All", *state names) and a state name -> ("All", *district names) dict;
+    the "All" key holds every district. Shared across reruns without a copy; read-only.
+    """
+    # rows with a missing/null id can't be linked to a state, so they are skipped
+    state_ids = {row["state_name"]: int(row["id"]) for row in _states if row.get("id") is not None}
+    names_by_state_id = {}
+    for d in _districts:
+        if d.get("state_id") is not None:
+            names_by_state_id.setdefault(int(d["state_id"]), []).append(d["district_name"])
+    districts_by_state = {name: ("All",) + tuple(names_by_state_id.get(sid, ())) for name, sid in state_ids.items()}
+    districts_by_state["All"] = ("All",) + tuple(d["district_name"] for d in _districts)
+    return ("All",) + tuple(state_ids), districts_by_state
+
 @st.cache_data(ttl=1800)
-def fetch_payload(api_url: str):
-    """Fetch payload from backend and cache it for 30 minutes.
-    Caching prevents new network requests on widget interactions (e.g. selector changes).
+def fetch_district(kpis_url: str, state_name: str, district_name: str):
+    """Fetch the aggregated figures for a single district from the backend.
+    The backend does the sums/means in SQL so the frontend only does dict lookups.
+    Raises ValueError (not cached) unless the response is a dict with every DISTRICT_KPI_AGGS key.
+    A short timeout is used since the caller can aggregate locally instead.
     """
-    resp = requests.get(api_url, timeout=1000)
+    params = {"district": district_name}
+    if state_name and state_name != "All":
+        params["state"] = state_name
+    resp = requests.get(kpis_url, params=params, timeout=3)
     resp.raise_for_status()
-    return resp.json()
+    data = resp.json()
+    if not isinstance(data, dict) or any(col not in data for col in DISTRICT_KPI_AGGS):
+        raise ValueError(f"Unexpected response shape from {kpis_url}")
+    return data
 
 # UI control to force-clear the cached payload and reload
 if st.sidebar.button("Force refresh data"):
+    # the payload is revalidated (conditional GET) below rather than dropped from the cache
     try:
-        st.cache_data.clear()
+        fetch_district.clear()
     except Exception:
         pass
+    st.session_state.pop("_kpis_endpoint_unavailable", None)
+    st.session_state["_force_refresh"] = True
     _safe_rerun()
 
-# Load data using cached fetch
+# Load data using cached fetch. A successful (or cached) fetch doubles as the backend
+# health check, so there is no separate /mgnrega/health round-trip.
 with st.spinner("Loading data from backend..."):
     try:
-        payload = fetch_payload(API_URL)
+        payload = load_payload(API_URL, force=st.session_state.pop("_force_refresh", False))
+    except requests.RequestException as e:
+        st.error(f"Backend is unreachable or unhealthy at {API_URL}: {e}")
+        if st.button("Retry connection"):
+            try:
+                st.cache_data.clear()
+            except Exception:
+                pass
+            _safe_rerun()
+        st.stop()
     except Exception as e:
         st.error(f"Failed to load data from backend at {API_URL}: {e}")
         if st.button("Force refresh / retry"):
@@ -109,23 +332,17 @@ districts = payload.get("districts", [])
 mgnrega_rows = payload.get("mgnrega_data", [])
 kpis = payload.get("kpis") or {}
 
-# Convert to DataFrames for easier handling
-states_df = pd.DataFrame(states) if states else pd.DataFrame(columns=["id", "state_name", "state_code"])
-districts_df = pd.DataFrame(districts) if districts else pd.DataFrame(columns=["id", "district_name", "district_code", "state_id"])
-m_df = pd.DataFrame(mgnrega_rows) if mgnrega_rows else pd.DataFrame()
+# Convert to DataFrames / lookups for easier handling (all cached per payload)
+payload_id = payload.get("_payload_id", API_URL)
+backend_state_map = build_indexes(payload_id, payload)
+state_options, districts_by_state = sidebar_options(payload_id, states or [], districts or [])
 
 # Sidebar selection
 st.sidebar.header("Filters")
-state_options = ["All"] + (states_df["state_name"].tolist() if not states_df.empty else [])
 selected_state = st.sidebar.selectbox("Select state", state_options, index=0)
 
 # Show a district selector filtered by state if selected
-if selected_state != "All" and not districts_df.empty:
-    sid = states_df.loc[states_df["state_name"] == selected_state, "id"].squeeze()
-    filtered_districts = districts_df[districts_df["state_id"] == int(sid)] if sid is not None else pd.DataFrame()
-    district_options = ["All"] + filtered_districts["district_name"].tolist()
-else:
-    district_options = ["All"] + (districts_df["district_name"].tolist() if not districts_df.empty else [])
+district_options = districts_by_state.get(selected_state, ("All",))
 
 selected_district = st.sidebar.selectbox("Select district", district_options, index=0)
 
@@ -135,43 +352,55 @@ if selected_district == "All":
     # stop further rendering — sidebar (selectors) remains visible
     st.stop()
 
+# Heavy imports and typed rows are only needed once a district is chosen
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+m_df, district_index = build_frames(payload_id, mgnrega_rows)
+
 # Helper to filter mgnrega dataframe
 def filter_data(df, state_name, district_name):
     if df.empty:
         return df
     if district_name and district_name != "All":
-        return df[df["district_name"] == district_name]
+        return df.iloc[district_index.get(district_name, [])]
     if state_name and state_name != "All":
         return df[df["state_name"] == state_name]
     return df
 
 view_df = filter_data(m_df, selected_state, selected_district)
 
+# Fallback when the backend has no /mgnrega/kpis route: look up the pre-aggregated row
+def compute_district_kpis(df, district_name):
+    table = kpi_table(payload_id, df)
+    if district_name not in table.index:
+        return {col: 0 for col in DISTRICT_KPI_AGGS}
+    return table.loc[district_name].to_dict()
+
+district_kpis = None
+if not st.session_state.get("_kpis_endpoint_unavailable"):
+    try:
+        district_kpis = fetch_district(KPIS_URL, selected_state, selected_district)
+    except requests.HTTPError as e:
+        # missing route: remember it so later reruns don't retry; other HTTP errors only skip this rerun
+        if e.response is not None and e.response.status_code in (404, 405):
+            st.session_state["_kpis_endpoint_unavailable"] = True
+    except ValueError:
+        # unexpected response shape (or non-JSON body): the route isn't the one we expect
+        st.session_state["_kpis_endpoint_unavailable"] = True
+    except Exception:
+        # timeout / connection error: fall back for this rerun only
+        pass
+if district_kpis is None:
+    district_kpis = compute_district_kpis(m_df, selected_district)
+
 # KPI source note
 if compute_kpis_in_frontend:
     st.info("KPIs will be calculated in the frontend. Currently this is disabled — backend KPIs are used when available.")
 else:
     pass
 
-# ------------------
-# District / State overview cards
-# ------------------
-st.header("Overview")
-col1, col2, col3, col4 = st.columns(4)
-
-def format_num(x):
-    try:
-        if pd.isna(x):
-            return "—"
-        if isinstance(x, float) and x.is_integer():
-            x = int(x)
-        return f"{x:,}"
-    except Exception:
-        return str(x)
-
-# Use backend per-state aggregates if present and state is selected
-backend_state_map = {s["state_name"]: s for s in (kpis.get("by_state") or [])}
-
+# Overview card values. Use backend per-state aggregates if present and state is selected (map built in build_indexes)
 if selected_state != "All" and selected_state in backend_state_map:
     state_stats = backend_state_map[selected_state]
 else:
@@ -182,222 +411,226 @@ else:
             dr = view_df.sort_values("data_fetched_on", ascending=False).iloc[0]
         except Exception:
             dr = view_df.iloc[0]
+        # int columns are typed and null-free; float columns may be NaN (see build_frames)
         state_stats = {
-            "approved_labour_budget": int(dr.get("approved_labour_budget") or 0),
-            "total_expenditure": float(dr.get("total_exp") or 0),
-            "avg_wage_rate": float(dr.get("average_wage_rate_per_day_per_person") or 0),
-            "avg_days_of_employment_per_household": float(dr.get("average_days_of_employment_per_household") or 0),
-            "total_households_worked": int(dr.get("total_households_worked") or 0),
-            "percent_utilization": None,
+            "approved_labour_budget": int(dr["approved_labour_budget"]),
+            "total_expenditure": _num(dr["total_exp"]),
+            "avg_wage_rate": _num(dr["average_wage_rate_per_day_per_person"]),
+            "avg_days_of_employment_per_household": _num(dr["average_days_of_employment_per_household"]),
+            "total_households_worked": int(dr["total_households_worked"]),
         }
-        try:
-            if state_stats["approved_labour_budget"]:
-                state_stats["percent_utilization"] = (
-                    float(state_stats["total_expenditure"]) / float(state_stats["approved_labour_budget"]) * 100
-                )
-        except Exception:
-            state_stats["percent_utilization"] = None
+        state_stats["percent_utilization"] = _safe_ratio(state_stats["total_expenditure"], state_stats["approved_labour_budget"], 100)
     else:
         # fallback: compute simple aggregates from view_df (for state-level view)
         agg = {}
         agg["approved_labour_budget"] = int(view_df["approved_labour_budget"].sum()) if not view_df.empty else 0
         agg["total_expenditure"] = float(view_df["total_exp"].sum()) if not view_df.empty else 0
-        agg["avg_wage_rate"] = float(view_df["average_wage_rate_per_day_per_person"].mean()) if not view_df.empty else 0
-        agg["avg_days_of_employment_per_household"] = float(view_df["average_days_of_employment_per_household"].mean()) if not view_df.empty else 0
+        agg["avg_wage_rate"] = _num(view_df["average_wage_rate_per_day_per_person"].mean()) if not view_df.empty else 0
+        agg["avg_days_of_employment_per_household"] = _num(view_df["average_days_of_employment_per_household"].mean()) if not view_df.empty else 0
         agg["total_households_worked"] = int(view_df["total_households_worked"].sum()) if not view_df.empty else 0
-        agg["percent_utilization"] = None
-        if agg["approved_labour_budget"]:
-            try:
-                agg["percent_utilization"] = float(agg["total_expenditure"]) / float(agg["approved_labour_budget"]) * 100
-            except Exception:
-                agg["percent_utilization"] = None
+        agg["percent_utilization"] = _safe_ratio(agg["total_expenditure"], agg["approved_labour_budget"], 100)
         state_stats = agg
 
-col1.metric("Approved Labour Budget", format_num(state_stats.get("approved_labour_budget")))
-col2.metric("Total Expenditure", format_num(state_stats.get("total_expenditure")))
-col3.metric("Avg Wage Rate (per day)", f"{state_stats.get('avg_wage_rate'):.2f}" if state_stats.get('avg_wage_rate') is not None else "—")
-col4.metric("Avg Days of Employment / HH", f"{state_stats.get('avg_days_of_employment_per_household'):.2f}" if state_stats.get('avg_days_of_employment_per_household') is not None else "—")
-
-# percent utilization progress bar / circular gauge
-pct = state_stats.get("percent_utilization")
-if pct is None:
-    st.progress(0)
-    st.write("% Utilization: —")
-else:
-    st.progress(min(max(int(pct), 0), 100))
-    st.write(f"% Utilization: {pct:.2f}%")
-
-# ------------------
-# Employment composition
-# ------------------
-st.header("Employment composition")
-
-# Prepare numbers
-total_persondays = int(view_df["persondays_of_central_liability_so_far"].sum()) if not view_df.empty else 0
-sc = int(view_df["sc_persondays"].sum()) if not view_df.empty else 0
-st_ = int(view_df["st_persondays"].sum()) if not view_df.empty else 0
-women = int(view_df["women_persondays"].sum()) if not view_df.empty else 0
-other = max(total_persondays - sc - st_ , 0)
-other_for_women = max(total_persondays - women, 0)
-
-col1, col2, col3 = st.columns(3)
-with col1:
-    st.subheader("SC / ST / Other persondays")
-    pc_df = pd.DataFrame({"category": ["SC", "ST", "Other"], "persondays": [sc, st_, other]})
-    fig = px.pie(pc_df, names="category", values="persondays", hole=0.35)
-    st.plotly_chart(fig, use_container_width=True)
-
-with col2:
-    st.subheader("Women persondays vs Other")
-    pc2 = pd.DataFrame({"category": ["Women", "Other"], "persondays": [women, other_for_women]})
-    fig2 = px.pie(pc2, names="category", values="persondays", hole=0.35)
-    st.plotly_chart(fig2, use_container_width=True)
-
-with col3:
-    st.subheader("Active workers vs Households")
-    active_workers = int(view_df["total_num_of_active_workers"].sum()) if not view_df.empty else 0
-    households = int(view_df["total_households_worked"].sum()) if not view_df.empty else 0
-    bar_df = pd.DataFrame({"metric": ["Active workers", "Households"], "count": [active_workers, households]})
-    fig3 = px.bar(bar_df, x="metric", y="count", text="count")
-    st.plotly_chart(fig3, use_container_width=True)
-
-# ------------------
-# Work progress
-# ------------------
-st.header("Work progress / status")
-col1, col2 = st.columns(2)
-
-completed = int(view_df["number_of_completed_works"].sum()) if not view_df.empty else 0
-ongoing = int(view_df["number_of_ongoing_works"].sum()) if not view_df.empty else 0
-pct_cat_b = float(view_df["percent_of_category_B_works"].mean()) if not view_df.empty else 0
-pct_agri = float(view_df["percentage_of_expenditure_on_agriculture_allied_works"].mean()) if not view_df.empty else 0
-pct_nrm = float(view_df["percent_of_NRM_expenditure"].mean()) if not view_df.empty else 0
-
-with col1:
-    st.subheader("Counts: Completed vs Ongoing")
-    cnt_df = pd.DataFrame({"status": ["Completed", "Ongoing"], "count": [completed, ongoing]})
-    figc = px.pie(cnt_df, names="status", values="count", hole=0.4)
-    st.plotly_chart(figc, use_container_width=True)
-
-with col2:
-    st.subheader("Category B / Agri allied / NRM (percent)")
-    bc_df = pd.DataFrame({"metric": ["Category B %", "Agri allied %", "NRM %"], "value": [pct_cat_b, pct_agri, pct_nrm]})
-    figb = px.bar(bc_df, x="metric", y="value", text="value")
-    st.plotly_chart(figb, use_container_width=True)
-
-# ------------------
-# Financial performance
-# ------------------
-st.header("Financial performance")
-col1, col2, col3 = st.columns(3)
-
-wages = float(view_df["wages"].sum()) if not view_df.empty else 0
-material = float(view_df["material_and_skilled_wages"].sum()) if not view_df.empty else 0
-pct_payments = float(view_df["percentage_payments_generated_within_15_days"].mean()) if not view_df.empty else 0
-nil_gps = int(view_df["number_of_gp_with_nil_exp"].sum()) if not view_df.empty else 0
-avg_cost_per_work = None
-try:
-    if (completed + ongoing) > 0:
-        avg_cost_per_work = float(view_df["total_exp"].sum()) / max(completed + ongoing, 1)
-except Exception:
-    avg_cost_per_work = None
-
-with col1:
-    st.subheader("Wage vs Material expenditure")
-    fm = pd.DataFrame({"category": ["Wages", "Material"], "amount": [wages, material]})
-    figf = px.pie(fm, names="category", values="amount", hole=0.4)
-    st.plotly_chart(figf, use_container_width=True)
-
-with col2:
-    st.subheader("% Payments generated within 15 days")
-    st.progress(min(max(int(pct_payments), 0), 100))
-    st.write(f"{pct_payments:.2f}%")
-
-with col3:
-    st.subheader("NIL GPs / Avg cost per work")
-    st.metric("GPs with NIL expenditure", format_num(nil_gps))
-    st.metric("Avg cost per work", f"{avg_cost_per_work:.2f}" if avg_cost_per_work is not None else "—")
-
-# ------------------
-# KPIs section (improved layout)
-# ------------------
-st.header("Key Performance Indicators (KPIs)")
-
-if kpis:
-    overall = kpis.get("overall", {})
-    # compute fallback values from data when backend doesn't provide them
+def format_num(x):
     try:
+        if pd.isna(x):
+            return "—"
+        if isinstance(x, float) and x.is_integer():
+            x = int(x)
+        return f"{x:,}"
+    except Exception:
+        return str(x)
+
+# Figure builders are memoized on their inputs. cache_resource hands back the same validated
+# go.Figure (no pickle copy, and st.plotly_chart doesn't re-validate a Figure the way it does a dict);
+# treat the returned figures as read-only. Plotly is imported lazily so the "no district selected"
+# path never loads it.
+@st.cache_resource(max_entries=256, show_spinner=False)
+def pie_figure(labels: tuple, values: tuple, hole: float):
+    import plotly.graph_objects as go
+    return go.Figure(go.Pie(labels=list(labels), values=list(values), hole=hole))
+
+@st.cache_resource(max_entries=256, show_spinner=False)
+def bar_figure(labels: tuple, values: tuple):
+    import plotly.graph_objects as go
+    return go.Figure(go.Bar(x=list(labels), y=list(values), text=list(values)))
+
+# st.fragment (or its experimental predecessor) reruns only the dashboard body when a widget
+# inside it changes; fall back to a plain function on Streamlit versions without it
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda f: f)
+
+@_fragment
+def render_dashboard(view_df, kpis, k, state_stats):
+    """Render the Overview through Raw data preview sections for the selected district.
+    `k` is the selected district's DistrictKPI.
+    """
+    # ------------------
+    # District / State overview cards
+    # ------------------
+    st.header("Overview")
+    col1, col2, col3, col4 = st.columns(4)
+
+    col1.metric("Approved Labour Budget", format_num(state_stats.get("approved_labour_budget")))
+    col2.metric("Total Expenditure", format_num(state_stats.get("total_expenditure")))
+    col3.metric("Avg Wage Rate (per day)", f"{state_stats.get('avg_wage_rate'):.2f}" if state_stats.get('avg_wage_rate') is not None else "—")
+    col4.metric("Avg Days of Employment / HH", f"{state_stats.get('avg_days_of_employment_per_household'):.2f}" if state_stats.get('avg_days_of_employment_per_household') is not None else "—")
+
+    # percent utilization progress bar / circular gauge
+    pct = state_stats.get("percent_utilization")
+    if pct is None:
+        st.progress(0)
+        st.write("% Utilization: —")
+    else:
+        st.progress(min(max(int(pct), 0), 100))
+        st.write(f"% Utilization: {pct:.2f}%")
+
+    # ------------------
+    # Employment composition
+    # ------------------
+    st.header("Employment composition")
+
+    # Prepare numbers
+    total_persondays = int(k.persondays_of_central_liability_so_far)
+    sc = int(k.sc_persondays)
+    st_ = int(k.st_persondays)
+    women = int(k.women_persondays)
+    other = max(total_persondays - sc - st_ , 0)
+    other_for_women = max(total_persondays - women, 0)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.subheader("SC / ST / Other persondays")
+        fig = pie_figure(("SC", "ST", "Other"), (sc, st_, other), 0.35)
+        st.plotly_chart(fig, use_container_width=True)
+
+    with col2:
+        st.subheader("Women persondays vs Other")
+        fig2 = pie_figure(("Women", "Other"), (women, other_for_women), 0.35)
+        st.plotly_chart(fig2, use_container_width=True)
+
+    with col3:
+        st.subheader("Active workers vs Households")
+        active_workers = int(k.total_num_of_active_workers)
+        households = int(k.total_households_worked)
+        fig3 = bar_figure(("Active workers", "Households"), (active_workers, households))
+        st.plotly_chart(fig3, use_container_width=True)
+
+    # ------------------
+    # Work progress
+    # ------------------
+    st.header("Work progress / status")
+    col1, col2 = st.columns(2)
+
+    completed = int(k.number_of_completed_works)
+    ongoing = int(k.number_of_ongoing_works)
+    pct_cat_b = k.percent_of_category_B_works
+    pct_agri = k.percentage_of_expenditure_on_agriculture_allied_works
+    pct_nrm = k.percent_of_NRM_expenditure
+
+    with col1:
+        st.subheader("Counts: Completed vs Ongoing")
+        figc = pie_figure(("Completed", "Ongoing"), (completed, ongoing), 0.4)
+        st.plotly_chart(figc, use_container_width=True)
+
+    with col2:
+        st.subheader("Category B / Agri allied / NRM (percent)")
+        figb = bar_figure(("Category B %", "Agri allied %", "NRM %"), (pct_cat_b, pct_agri, pct_nrm))
+        st.plotly_chart(figb, use_container_width=True)
+
+    # ------------------
+    # Financial performance
+    # ------------------
+    st.header("Financial performance")
+    col1, col2, col3 = st.columns(3)
+
+    wages = k.wages
+    material = k.material_and_skilled_wages
+    pct_payments = k.percentage_payments_generated_within_15_days
+    nil_gps = int(k.number_of_gp_with_nil_exp)
+    avg_cost_per_work = k.avg_cost_per_work
+
+    with col1:
+        st.subheader("Wage vs Material expenditure")
+        figf = pie_figure(("Wages", "Material"), (wages, material), 0.4)
+        st.plotly_chart(figf, use_container_width=True)
+
+    with col2:
+        st.subheader("% Payments generated within 15 days")
+        st.progress(min(max(int(pct_payments), 0), 100))
+        st.write(f"{pct_payments:.2f}%")
+
+    with col3:
+        st.subheader("NIL GPs / Avg cost per work")
+        st.metric("GPs with NIL expenditure", format_num(nil_gps))
+        st.metric("Avg cost per work", f"{avg_cost_per_work:.2f}" if avg_cost_per_work is not None else "—")
+
+    # ------------------
+    # KPIs section (improved layout)
+    # ------------------
+    st.header("Key Performance Indicators (KPIs)")
+
+    if kpis:
+        overall = kpis.get("overall", {})
+        # compute fallback values from data when backend doesn't provide them
         fem = overall.get("female_participation_rate")
         if fem is None and not view_df.empty:
-            fem = (float(view_df["women_persondays"].sum()) / float(view_df["persondays_of_central_liability_so_far"].sum())) * 100
-    except Exception:
-        fem = None
+            fem = k.female_participation_rate
 
-    try:
         scst = overall.get("sc_st_participation_rate")
         if scst is None and not view_df.empty:
-            scst = (float(view_df["sc_persondays"].sum() + view_df["st_persondays"].sum()) / float(view_df["persondays_of_central_liability_so_far"].sum())) * 100
-    except Exception:
-        scst = None
+            scst = k.sc_st_participation_rate
 
-    tpr = overall.get("average_percentage_payments_within_15_days")
-    if tpr is None and not view_df.empty:
-        try:
-            tpr = float(view_df["percentage_payments_generated_within_15_days"].mean())
-        except Exception:
-            tpr = None
+        tpr = overall.get("average_percentage_payments_within_15_days")
+        if tpr is None and not view_df.empty:
+            tpr = k.percentage_payments_generated_within_15_days
 
-    # Work completion ratio
-    try:
-        completed = int(view_df["number_of_completed_works"].sum()) if not view_df.empty else 0
-        ongoing = int(view_df["number_of_ongoing_works"].sum()) if not view_df.empty else 0
-        wcr = (completed / (completed + ongoing) * 100) if (completed + ongoing) > 0 else None
-    except Exception:
-        wcr = None
-
-    # Budget utilization
-    bud_pct = overall.get("percent_utilization")
-
-    # Top row: KPIs as cards
-    k1, k2, k3, k4, k5 = st.columns(5)
-    k1.metric("Budget utilization (%)", f"{bud_pct:.2f}%" if bud_pct is not None else "—")
-    k2.metric("Female participation (%)", f"{fem:.2f}%" if fem is not None else "—")
-    k3.metric("SC/ST participation (%)", f"{scst:.2f}%" if scst is not None else "—")
-    k4.metric("Timely payment rate (%)", f"{tpr:.2f}%" if tpr is not None else "—")
-    k5.metric("Work completion ratio (%)", f"{wcr:.2f}%" if wcr is not None else "—")
-
-    # Second row: progress bars for the percentage KPIs (visual)
-    p1, p2, p3, p4, p5 = st.columns(5)
-    def _pct(v):
-        try:
-            return max(0, min(100, int(round(float(v)))))
-        except Exception:
-            return 0
+        # Work completion ratio
+        wcr = k.work_completion_ratio
 
-    p1.progress(_pct(bud_pct) if bud_pct is not None else 0)
-    p1.caption("Budget used")
+        # Budget utilization
+        bud_pct = overall.get("percent_utilization")
 
-    p2.progress(_pct(fem) if fem is not None else 0)
-    p2.caption("Female participation")
+        # Top row: KPIs as cards
+        k1, k2, k3, k4, k5 = st.columns(5)
+        k1.metric("Budget utilization (%)", f"{bud_pct:.2f}%" if bud_pct is not None else "—")
+        k2.metric("Female participation (%)", f"{fem:.2f}%" if fem is not None else "—")
+        k3.metric("SC/ST participation (%)", f"{scst:.2f}%" if scst is not None else "—")
+        k4.metric("Timely payment rate (%)", f"{tpr:.2f}%" if tpr is not None else "—")
+        k5.metric("Work completion ratio (%)", f"{wcr:.2f}%" if wcr is not None else "—")
 
-    p3.progress(_pct(scst) if scst is not None else 0)
-    p3.caption("SC/ST participation")
+        # Second row: progress bars for the percentage KPIs (visual)
+        p1, p2, p3, p4, p5 = st.columns(5)
+        # one vectorized pass: None -> NaN -> 0, then round and clamp to the 0-100 progress range
+        pcts = np.clip(np.nan_to_num(np.array([bud_pct, fem, scst, tpr, wcr], dtype=float)).round(), 0, 100).astype(int)
 
-    p4.progress(_pct(tpr) if tpr is not None else 0)
-    p4.caption("Timely payments within 15 days")
+        p1.progress(int(pcts[0]))
+        p1.caption("Budget used")
 
-    p5.progress(_pct(wcr) if wcr is not None else 0)
-    p5.caption("Work completion")
+        p2.progress(int(pcts[1]))
+        p2.caption("Female participation")
 
-    # Small notes line
-    st.caption("Values shown use backend-calculated KPIs when available; otherwise computed from the selected district's data.")
-else:
-    st.warning("No backend KPIs available; compute in frontend or run the backend KPI endpoint.")
+        p3.progress(int(pcts[2]))
+        p3.caption("SC/ST participation")
+
+        p4.progress(int(pcts[3]))
+        p4.caption("Timely payments within 15 days")
+
+        p5.progress(int(pcts[4]))
+        p5.caption("Work completion")
+
+        # Small notes line
+        st.caption("Values shown use backend-calculated KPIs when available; otherwise computed from the selected district's data.")
+    else:
+        st.warning("No backend KPIs available; compute in frontend or run the backend KPI endpoint.")
+
+    # Footer / data preview
+    with st.expander("Raw data preview"):
+        st.subheader("mgnrega_data (preview)")
+        # expander bodies run even when collapsed; only serialize the table once the user asks for it
+        if st.checkbox("Show rows", key="preview_open"):
+            st.dataframe(view_df.head(200))
 
-# Footer / data preview
-with st.expander("Raw data preview"):
-    st.subheader("mgnrega_data (preview)")
-    st.dataframe(view_df.head(200))
 
+render_dashboard(view_df, kpis, DistrictKPI.from_mapping(district_kpis), state_stats)
 
 # End of dashboard